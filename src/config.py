@@ -1,3 +1,4 @@
+import os
 from dataclasses import dataclass
 
 @dataclass
@@ -15,4 +16,16 @@ class Hyperparameters:
     learning_rate: float = 3e-5
     num_epochs: int = 2
     test_size: float = 0.4
-    early_stop_threshold: float = 0.05
\ No newline at end of file
+    early_stop_threshold: float = 0.05
+    accum_steps: int = 1  # Gradient accumulation micro-batches per step
+    precision: str = "fp32"  # One of "fp32", "fp16" or "bf16"
+    compile_model: bool = False  # torch.compile the model (slow first step)
+    static_shapes: bool = False  # Fixed batch shapes for CUDA graph replay
+    quantize: bool = False  # Run an extra int8-quantized eval after training
+    freeze_layers: int = 0  # Freeze embeddings + this many bottom layers
+
+    # Dataloading: background workers keep the GPU fed between steps. Large
+    # prefetch_factor values grow pinned-memory usage, so keep it modest.
+    num_workers: int = (os.cpu_count() or 2) // 2
+    prefetch_factor: int = 4
+    group_by_length: bool = True  # Bucket training batches by token length
\ No newline at end of file
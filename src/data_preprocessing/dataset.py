@@ -1,12 +1,13 @@
 """Dataset loading and preprocessing functions."""
 import json
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 import torch
 from sklearn.model_selection import train_test_split
 from torch.utils.data import Dataset, DataLoader
+from torch.utils.data.distributed import DistributedSampler
 from transformers import AutoTokenizer, DebertaV2Tokenizer
 
 
@@ -84,34 +85,158 @@ class LoanDefaultDataset(Dataset):
             text,
             truncation=True,
             max_length=512,
-            padding="max_length",
             return_tensors="pt"
         )
-        
-        # Remove the batch dimension the tokenizer adds
+
+        # Remove the batch dimension the tokenizer adds; padding happens per
+        # batch in PaddingCollator rather than per sample
         item = {
-            "input_ids": encoding["input_ids"].squeeze(),
-            "attention_mask": encoding["attention_mask"].squeeze(),
+            "input_ids": encoding["input_ids"].squeeze(0),
+            "attention_mask": encoding["attention_mask"].squeeze(0),
             "label": torch.tensor(label, dtype=torch.long)
         }
-        
+
         return item
 
 
+class PaddingCollator:
+    """Collate function that pads each batch to its longest sequence.
+
+    Batch lengths are rounded up to a multiple of `pad_to_multiple_of` so
+    the attention/FFN matmuls stay on the fast Tensor Core path. If
+    `max_length` is set, every batch is padded to that fixed length instead,
+    giving static shapes that CUDA graph capture (torch.compile's
+    reduce-overhead mode) can replay.
+    """
+
+    def __init__(
+        self,
+        tokenizer: AutoTokenizer,
+        pad_to_multiple_of: int = 8,
+        max_length: Optional[int] = None
+    ):
+        """Initialize the collator.
+
+        Args:
+            tokenizer: Tokenizer used to pad the batch
+            pad_to_multiple_of: Round padded lengths up to a multiple of this
+            max_length: If set, pad every batch to this fixed length
+        """
+        self.tokenizer = tokenizer
+        self.pad_to_multiple_of = pad_to_multiple_of
+        self.max_length = max_length
+
+    def __call__(self, batch: List[Dict[str, torch.Tensor]]) -> Dict[str, torch.Tensor]:
+        """Pad a list of samples into a batch.
+
+        Args:
+            batch: List of items produced by LoanDefaultDataset
+
+        Returns:
+            Dictionary of batched input_ids, attention_mask and label tensors
+        """
+        features = [
+            {"input_ids": item["input_ids"], "attention_mask": item["attention_mask"]}
+            for item in batch
+        ]
+        encoding = self.tokenizer.pad(
+            features,
+            padding="longest" if self.max_length is None else "max_length",
+            max_length=self.max_length,
+            pad_to_multiple_of=self.pad_to_multiple_of,
+            return_tensors="pt"
+        )
+
+        return {
+            "input_ids": encoding["input_ids"],
+            "attention_mask": encoding["attention_mask"],
+            "label": torch.stack([item["label"] for item in batch])
+        }
+
+
+class LengthBucketBatchSampler:
+    """Batch sampler that groups examples of similar token length.
+
+    Shuffled indices are sliced into windows of `batch_size * bucket_size`,
+    sorted by length within each window and chunked into batches, and the
+    batch order is shuffled again. Batches of similar lengths pad to far
+    shorter sequences, cutting wasted attention FLOPs while keeping the
+    ordering stochastic between epochs.
+    """
+
+    def __init__(
+        self,
+        lengths: List[int],
+        batch_size: int,
+        bucket_size: int = 50,
+        drop_last: bool = False
+    ):
+        """Initialize the sampler.
+
+        Args:
+            lengths: Token count of each example in the dataset
+            batch_size: Number of examples per batch
+            bucket_size: Batches per sorting window
+            drop_last: Drop the final smaller-than-batch_size batch
+        """
+        self.lengths = lengths
+        self.batch_size = batch_size
+        self.bucket_size = bucket_size
+        self.drop_last = drop_last
+
+    def __len__(self) -> int:
+        """Return the number of batches per epoch."""
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self) -> Iterator[List[int]]:
+        """Yield index batches grouped by similar length."""
+        perm = torch.randperm(len(self.lengths)).tolist()
+        window_size = self.batch_size * self.bucket_size
+
+        batches = []
+        for start in range(0, len(perm), window_size):
+            window = sorted(perm[start:start + window_size], key=lambda i: self.lengths[i])
+            batches.extend(
+                window[i:i + self.batch_size]
+                for i in range(0, len(window), self.batch_size)
+            )
+
+        if self.drop_last:
+            batches = [batch for batch in batches if len(batch) == self.batch_size]
+
+        for idx in torch.randperm(len(batches)).tolist():
+            yield batches[idx]
+
+
 def create_dataloaders(
     train_df: pd.DataFrame,
     test_df: pd.DataFrame,
     tokenizer_name: str = "distilbert/distilbert-base-uncased",
-    batch_size: int = 8
+    batch_size: int = 8,
+    num_workers: int = 0,
+    prefetch_factor: int = 4,
+    static_shapes: bool = False,
+    distributed: bool = False,
+    group_by_length: bool = True
 ) -> Tuple[DataLoader, DataLoader]:
     """Create PyTorch DataLoaders for train and test sets.
-    
+
     Args:
         train_df: Training DataFrame
         test_df: Test DataFrame
         tokenizer_name: Name of the pre-trained tokenizer
         batch_size: Batch size for DataLoaders
-        
+        num_workers: Number of background dataloading workers (0 = main process)
+        prefetch_factor: Batches prefetched per worker (ignored if num_workers=0)
+        static_shapes: Pad every batch to a fixed (batch_size, 512) shape and
+            drop the ragged last training batch, enabling CUDA graph replay
+        distributed: Shard the training set across ranks with a
+            DistributedSampler (evaluation stays unsharded on every rank)
+        group_by_length: Bucket training batches by token length to minimise
+            padding (ignored when distributed)
+
     Returns:
         Tuple of (train_loader, test_loader)
     """
@@ -132,16 +257,64 @@ def create_dataloaders(
         tokenizer_name=tokenizer_name
     )
     
-    train_loader = DataLoader(
-        train_dataset,
-        batch_size=batch_size,
-        shuffle=True
+    collator = PaddingCollator(
+        train_dataset.tokenizer,
+        max_length=512 if static_shapes else None
     )
-    
+
+    # Pinned host memory lets the .to(device, non_blocking=True) copies in the
+    # training loop overlap with GPU compute
+    pin_memory = torch.cuda.is_available()
+
+    # persistent_workers keeps tokenizer state warm across epochs;
+    # prefetch_factor is only valid with background workers
+    worker_kwargs = {}
+    if num_workers > 0:
+        worker_kwargs = {
+            "num_workers": num_workers,
+            "prefetch_factor": prefetch_factor,
+            "persistent_workers": True,
+        }
+
+    train_sampler = DistributedSampler(train_dataset) if distributed else None
+
+    if group_by_length and train_sampler is None:
+        # One up-front tokenization pass to get per-example token counts
+        lengths = [
+            len(ids) for ids in
+            train_dataset.tokenizer(
+                train_dataset.texts, truncation=True, max_length=512
+            )["input_ids"]
+        ]
+        batch_sampler = LengthBucketBatchSampler(
+            lengths, batch_size, drop_last=static_shapes
+        )
+        train_loader = DataLoader(
+            train_dataset,
+            batch_sampler=batch_sampler,
+            collate_fn=collator,
+            pin_memory=pin_memory,
+            **worker_kwargs
+        )
+    else:
+        train_loader = DataLoader(
+            train_dataset,
+            batch_size=batch_size,
+            shuffle=train_sampler is None,
+            sampler=train_sampler,
+            collate_fn=collator,
+            pin_memory=pin_memory,
+            drop_last=static_shapes,
+            **worker_kwargs
+        )
+
     test_loader = DataLoader(
         test_dataset,
         batch_size=batch_size,
-        shuffle=False
+        shuffle=False,
+        collate_fn=collator,
+        pin_memory=pin_memory,
+        **worker_kwargs
     )
-    
+
     return train_loader, test_loader
\ No newline at end of file
@@ -109,6 +109,35 @@ def get_basic_metrics(all_labels: List[int], all_preds: List[int]) -> Dict[str,
     }
 
 
+def get_metrics_from_counts(tn: int, fp: int, fn: int, tp: int) -> Dict[str, float]:
+    """Calculate binary classification metrics from confusion-matrix counts.
+
+    Args:
+        tn: True negatives
+        fp: False positives
+        fn: False negatives
+        tp: True positives
+
+    Returns:
+        Dictionary containing accuracy, precision, recall, and F1 score
+    """
+    total = tn + fp + fn + tp
+    accuracy = (tp + tn) / total if total > 0 else 0.0
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+    f1 = (
+        2 * precision * recall / (precision + recall)
+        if (precision + recall) > 0 else 0.0
+    )
+
+    return {
+        "accuracy": accuracy,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1
+    }
+
+
 def generate_detailed_evaluation(
     all_labels: List[int], 
     all_preds: List[int], 
@@ -55,14 +55,15 @@ def log_metrics(train_loss, test_loss, metrics) -> None:
   console.print(f"[yellow]Metrics:[/yellow] Accuracy={metrics['accuracy']:.4f}, F1={metrics['f1']:.4f}, Precision={metrics['precision']:.4f}, Recall={metrics['recall']:.4f}")
   
 
-def log_progress(title: str, colour: str) -> Progress:
+def log_progress(title: str, colour: str, disable: bool = False) -> Progress:
   progress = Progress(
         TextColumn(f"[bold {colour}]{title}[/bold {colour}]"),
         BarColumn(bar_width=40),
         MofNCompleteColumn(),
         TimeElapsedColumn(),
         console=console,
-        refresh_per_second=1
+        refresh_per_second=1,
+        disable=disable
     )
   return progress
         
@@ -1,4 +1,5 @@
 from src.logging.logging import log_panel, log_hyperparameters
+from src.training.device import is_main_process
 from src.training.train import main as train_main
 import argparse
 from src.config import Hyperparameters
@@ -6,18 +7,20 @@ from src.config import Hyperparameters
 
 def main():
     """Main function to train the model."""
-    
-    log_panel(
-        colour="magenta",
-        body="DistilBERT Loan Default Classification", 
-    )
+
+    if is_main_process():
+        log_panel(
+            colour="magenta",
+            body="DistilBERT Loan Default Classification",
+        )
 
     HYPERPARAMETERS = Hyperparameters(
         num_epochs=6
     )
-    
-    log_hyperparameters(HYPERPARAMETERS)
-    
+
+    if is_main_process():
+        log_hyperparameters(HYPERPARAMETERS)
+
     args = argparse.Namespace(**vars(HYPERPARAMETERS))
     
     train_main(args)
@@ -13,9 +13,40 @@ PREDICTION_CONFIG = {
     "model_path": "models/best_model.pt",
     "model_name": "distilbert/distilbert-base-uncased",
     "input_file": None,  # Set to a file path to batch process texts, or None for interactive mode
+    "jit_trace": True,  # Freeze the model into a TorchScript trace for faster inference
 }
 
 
+def trace_model(model: DistilBERTClassifier, device: torch.device) -> torch.nn.Module:
+    """Trace and freeze the underlying transformer for inference.
+
+    Freezing inlines the weights into the TorchScript graph, so this is only
+    safe once training is finished and the checkpoint is loaded.
+
+    Args:
+        model: Trained classifier with weights already loaded
+        device: Device to run inference on
+
+    Returns:
+        A frozen ScriptModule returning a dict with 'logits'
+    """
+    example = (
+        torch.zeros(1, 512, dtype=torch.long, device=device),
+        torch.ones(1, 512, dtype=torch.long, device=device),
+    )
+
+    model.eval()
+    with torch.no_grad():
+        traced = torch.jit.trace(model.model, example, strict=False)
+        traced = torch.jit.freeze(traced)
+
+        # Warm up so the profiling executor optimizes the graph up front
+        for _ in range(2):
+            traced(*example)
+
+    return traced
+
+
 def predict_text(
     model: torch.nn.Module,
     tokenizer: AutoTokenizer,
@@ -50,8 +81,10 @@ def predict_text(
     model.eval()
     with torch.no_grad():
         outputs = model(input_ids, attention_mask)
-        logits = outputs["logits"]
-        
+        # Traced modules return the HF dict; the classifier returns (loss, logits)
+        logits = outputs["logits"] if isinstance(outputs, dict) else outputs[1]
+
+
         probs = torch.softmax(logits, dim=1)
         pred_class = torch.argmax(logits, dim=1).item()
         pred_prob = probs[0, pred_class].item()
@@ -107,7 +140,11 @@ def main():
     model = DistilBERTClassifier(model_name=PREDICTION_CONFIG["model_name"])
     model.load_state_dict(torch.load(model_path, map_location=device)["model_state_dict"])
     model.to(device)
-    
+
+    if PREDICTION_CONFIG["jit_trace"]:
+        model = trace_model(model, device)
+
+
     # Load tokenizer
     tokenizer = AutoTokenizer.from_pretrained(PREDICTION_CONFIG["model_name"])
     
@@ -1,4 +1,8 @@
+import os
+from typing import Optional
+
 import torch
+import torch.distributed as dist
 
 from src.logging.logging import log_print
 
@@ -13,5 +17,36 @@ def get_device():
     else:
         device = torch.device("cpu")
         log_print(body="Using CPU", colour="green")
-        
-    return device
\ No newline at end of file
+
+    return device
+
+
+def init_distributed() -> Optional[torch.device]:
+    """Initialize distributed training when launched via torchrun.
+
+    Returns:
+        The local CUDA device for this rank, or None when not running under
+        torchrun (single-process training)
+    """
+    if "RANK" not in os.environ or "WORLD_SIZE" not in os.environ:
+        return None
+
+    dist.init_process_group("nccl")
+    local_rank = int(os.environ["LOCAL_RANK"])
+    torch.cuda.set_device(local_rank)
+
+    if dist.get_rank() == 0:
+        log_print(
+            body=f"Using DDP across {dist.get_world_size()} GPUs",
+            colour="green",
+        )
+
+    return torch.device("cuda", local_rank)
+
+
+def is_main_process() -> bool:
+    """Return True on rank 0 (or when not running distributed)."""
+    if dist.is_available() and dist.is_initialized():
+        return dist.get_rank() == 0
+    # Before init_process_group runs, fall back to torchrun's env var
+    return os.environ.get("RANK", "0") == "0"
@@ -1,6 +1,6 @@
 """DistilBERT model for text classification."""
 import warnings
-from typing import Dict, Optional, Tuple, Union
+from typing import Optional, Tuple
 
 import torch
 import torch.nn as nn
@@ -31,30 +31,44 @@ class DistilBERTClassifier(nn.Module):
             num_labels=num_labels
         )
         
+    def freeze_layers(self, num_layers: int) -> None:
+        """Freeze the embeddings and the bottom transformer layers.
+
+        Frozen parameters are skipped by backward and carry no optimizer
+        state, cutting fine-tuning cost at some accuracy risk.
+
+        Args:
+            num_layers: Number of encoder layers to freeze from the bottom
+        """
+        for param in self.model.distilbert.embeddings.parameters():
+            param.requires_grad_(False)
+
+        for layer in self.model.distilbert.transformer.layer[:num_layers]:
+            for param in layer.parameters():
+                param.requires_grad_(False)
+
     def forward(
         self,
         input_ids: torch.Tensor,
         attention_mask: torch.Tensor,
         labels: Optional[torch.Tensor] = None
-    ) -> Union[Dict[str, torch.Tensor], Tuple[torch.Tensor, torch.Tensor]]:
+    ) -> Tuple[Optional[torch.Tensor], torch.Tensor]:
         """Forward pass.
-        
+
         Args:
             input_ids: Token IDs
             attention_mask: Attention mask
             labels: Optional labels for computing loss
-            
+
         Returns:
-            If labels are provided, returns (loss, logits)
-            Otherwise, returns a dictionary with 'logits'
+            Tuple of (loss, logits); loss is None when no labels are given.
+            The fixed tuple shape keeps the forward graph-capture friendly for
+            torch.compile and jit tracing.
         """
         outputs = self.model(
             input_ids=input_ids,
             attention_mask=attention_mask,
             labels=labels
         )
-        
-        if labels is not None:
-            return outputs.loss, outputs.logits
-        else:
-            return {"logits": outputs.logits}
\ No newline at end of file
+
+        return outputs.loss, outputs.logits
\ No newline at end of file
@@ -1,18 +1,54 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.backends.mps
+from torch.nn.parallel import DistributedDataParallel as DDP
 from torch.utils.data import DataLoader
+from torch.utils.data.distributed import DistributedSampler
 
 from src.logging.logging import log_panel, log_metrics, log_progress, log_print
 from src.config import Hyperparameters
 from src.data_preprocessing.dataset import create_dataloaders, load_dataset, split_dataset
-from src.evaluation.evaluate import get_basic_metrics, generate_detailed_evaluation
+from src.evaluation.evaluate import get_metrics_from_counts, generate_detailed_evaluation
 from src.training.model import DistilBERTClassifier
-from src.training.device import get_device
+from src.training.device import get_device, init_distributed, is_main_process
+
+
+def get_autocast(device: torch.device, precision: str) -> torch.autocast:
+    """Build an autocast context for the requested precision.
+
+    Args:
+        device: Device the model runs on
+        precision: One of "fp32", "fp16" or "bf16"
+
+    Returns:
+        An autocast context manager (disabled for fp32 or non-CUDA devices)
+    """
+    enabled = precision != "fp32" and device.type == "cuda"
+    dtype = torch.float16 if precision == "fp16" else torch.bfloat16
+    return torch.autocast(device_type="cuda", dtype=dtype, enabled=enabled)
+
+
+def snapshot_to_cpu(obj: Any) -> Any:
+    """Recursively copy all tensors in a (nested) state dict to the CPU.
+
+    Args:
+        obj: A tensor, or a dict/list possibly containing tensors
+
+    Returns:
+        The same structure with every tensor detached and moved to the CPU
+    """
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().cpu()
+    if isinstance(obj, dict):
+        return {k: snapshot_to_cpu(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [snapshot_to_cpu(v) for v in obj]
+    return obj
 
 
 def train_epoch(
@@ -20,45 +56,70 @@ def train_epoch(
     dataloader: DataLoader,
     optimizer: torch.optim.Optimizer,
     device: torch.device,
+    precision: str = "fp32",
+    accum_steps: int = 1,
 ) -> float:
     """Train for one epoch.
-    
+
     Args:
         model: The model to train
         dataloader: Training data loader
         optimizer: Optimizer
         device: Device to train on
-        scaler: Gradient scaler for mixed precision training
-        
+        precision: Numeric precision for the forward pass ("fp32", "fp16" or "bf16")
+        accum_steps: Number of micro-batches to accumulate before stepping
+
     Returns:
         Average training loss
     """
     model.train()
-    total_loss = 0
+    # Accumulate the loss on-device; .item() every step would force a CUDA sync
+    total_loss = torch.zeros((), device=device)
     total_batches = len(dataloader)
-    
-    progress = log_progress(title="Training", colour="Green")
-    
+
+    autocast = get_autocast(device, precision)
+    # The scaler is only needed for fp16; for fp32/bf16 it is a no-op passthrough
+    scaler = torch.amp.GradScaler("cuda", enabled=precision == "fp16" and device.type == "cuda")
+
+    # torch.compile may wrap the DDP wrapper; no_sync lives on the DDP module
+    ddp_module = getattr(model, "_orig_mod", model)
+
+    # Only rank 0 renders the bar; refresh is already throttled to 1/s
+    progress = log_progress(title="Training", colour="Green", disable=not is_main_process())
+
     with progress:
         task = progress.add_task("Training", total=total_batches)
-        
-        for batch in dataloader:
+
+        optimizer.zero_grad(set_to_none=True)
+
+        for i, batch in enumerate(dataloader):
             # Move batch to device
-            input_ids = batch["input_ids"].to(device)
-            attention_mask = batch["attention_mask"].to(device)
-            labels = batch["label"].to(device)
-            
-            # Zero gradients
-            optimizer.zero_grad()
-            
-            loss, _ = model(input_ids, attention_mask, labels)
-            loss.backward()
-            optimizer.step()
-            
-            total_loss += loss.item()
+            input_ids = batch["input_ids"].to(device, non_blocking=True)
+            attention_mask = batch["attention_mask"].to(device, non_blocking=True)
+            labels = batch["label"].to(device, non_blocking=True)
+
+            with autocast:
+                loss, _ = model(input_ids, attention_mask, labels)
+
+            scaled_loss = scaler.scale(loss / accum_steps)
+            is_boundary = (i + 1) % accum_steps == 0 or (i + 1) == total_batches
+
+            if isinstance(ddp_module, DDP) and not is_boundary:
+                # Skip the gradient AllReduce until the accumulation boundary
+                with ddp_module.no_sync():
+                    scaled_loss.backward()
+            else:
+                scaled_loss.backward()
+
+            if is_boundary:
+                scaler.step(optimizer)
+                scaler.update()
+                optimizer.zero_grad(set_to_none=True)
+
+            total_loss += loss.detach()
             progress.update(task, advance=1)
-    
-    return total_loss / len(dataloader)
+
+    return (total_loss / len(dataloader)).item()
 
 
 def evaluate(
@@ -67,10 +128,11 @@ def evaluate(
     device: torch.device,
     train_loss: float = 0.0,
     final_epoch: bool = False,
-    output_dir: Optional[Path] = None
+    output_dir: Optional[Path] = None,
+    precision: str = "fp32",
 ) -> Tuple[float, Dict[str, float]]:
     """Evaluate the model.
-    
+
     Args:
         model: The model to evaluate
         dataloader: Evaluation data loader
@@ -78,57 +140,74 @@ def evaluate(
         train_loss: Training loss for the current epoch (for display purposes)
         final_epoch: Whether this is the final epoch evaluation
         output_dir: Directory to save evaluation results (required if final_epoch=True)
-        
+        precision: Numeric precision for the forward pass ("fp32", "fp16" or "bf16")
+
     Returns:
         Tuple of (average loss, metrics dict)
     """
     model.eval()
-    total_loss = 0
-    all_preds = []
-    all_labels = []
-    all_probs = []
+    # Accumulate the loss on-device; .item() every step would force a CUDA sync
+    total_loss = torch.zeros((), device=device)
     total_batches = len(dataloader)
-    
-    progress = log_progress(title="Evaluating", colour="blue")
-    
+
+    # Preallocate on-device buffers so predictions stay on the GPU until the
+    # end of the loop instead of syncing to Python lists every batch
+    num_samples = len(dataloader.dataset)
+    preds_buf = torch.empty(num_samples, dtype=torch.long, device=device)
+    labels_buf = torch.empty(num_samples, dtype=torch.long, device=device)
+    probs_buf = torch.empty(num_samples, dtype=torch.float, device=device)
+    offset = 0
+
+    autocast = get_autocast(device, precision)
+
+    progress = log_progress(title="Evaluating", colour="blue", disable=not is_main_process())
+
     with torch.no_grad():
         with progress:
             task = progress.add_task("Evaluating", total=total_batches)
             
             for batch in dataloader:
                 # Move batch to device
-                input_ids = batch["input_ids"].to(device)
-                attention_mask = batch["attention_mask"].to(device)
-                labels = batch["label"].to(device)
+                input_ids = batch["input_ids"].to(device, non_blocking=True)
+                attention_mask = batch["attention_mask"].to(device, non_blocking=True)
+                labels = batch["label"].to(device, non_blocking=True)
                 
                 # Forward pass
-                loss, logits = model(input_ids, attention_mask, labels)
+                with autocast:
+                    loss, logits = model(input_ids, attention_mask, labels)
                 
-                # Get predictions
-                probs = torch.softmax(logits, dim=1)
-                preds = torch.argmax(logits, dim=1).cpu().numpy()
-                labels_np = labels.cpu().numpy()
-                
-                all_preds.extend(preds)
-                all_labels.extend(labels_np)
-                all_probs.extend(probs[:, 1].cpu().numpy())
-                
-                total_loss += loss.item()
+                # Get predictions, kept on-device. For binary logits,
+                # P(class 1) = sigmoid(l1 - l0) and the prediction is l1 > l0,
+                # which avoids the full softmax and a separate argmax kernel
+                diff = logits[:, 1] - logits[:, 0]
+                batch_size = labels.shape[0]
+                preds_buf[offset:offset + batch_size] = (diff > 0).long()
+                labels_buf[offset:offset + batch_size] = labels
+                probs_buf[offset:offset + batch_size] = torch.sigmoid(diff)
+                offset += batch_size
+
+                total_loss += loss.detach()
                 progress.update(task, advance=1)
-    
-    # Calculate basic metrics using the utility function from evaluate.py
-    metrics = get_basic_metrics(all_labels, all_preds)
-    test_loss = total_loss / len(dataloader)
-    
-    log_metrics(train_loss, test_loss, metrics)
-    
+
+    # One on-device reduction gives [TN, FP, FN, TP]; all metrics derive from
+    # these four counts instead of separate sklearn passes over the arrays
+    confusion = torch.bincount(
+        2 * labels_buf[:offset] + preds_buf[:offset], minlength=4
+    )
+    tn, fp, fn, tp = confusion.tolist()
+    metrics = get_metrics_from_counts(tn, fp, fn, tp)
+    test_loss = (total_loss / len(dataloader)).item()
+
+    if is_main_process():
+        log_metrics(train_loss, test_loss, metrics)
+
     # If this is the final epoch, generate detailed evaluation reports
-    if final_epoch and output_dir:
+    if final_epoch and output_dir and is_main_process():
         eval_dir = output_dir / "evaluation_results"
         generate_detailed_evaluation(
-            all_labels=all_labels,
-            all_preds=all_preds,
-            all_probs=all_probs,
+            all_labels=labels_buf[:offset].cpu().numpy(),
+            all_preds=preds_buf[:offset].cpu().numpy(),
+            all_probs=probs_buf[:offset].cpu().numpy(),
             output_dir=eval_dir
         )
     
@@ -144,9 +223,11 @@ def train(
     num_epochs: int = 5,
     early_stop_threshold: float = 0.2,
     output_dir: Path = Path("models"),
+    precision: str = "fp32",
+    accum_steps: int = 1,
 ) -> Tuple[List[float], List[Dict[str, float]]]:
     """Train the model.
-    
+
     Args:
         model: The model to train
         train_loader: Training data loader
@@ -155,7 +236,9 @@ def train(
         device: Device to train on
         num_epochs: Number of training epochs
         output_dir: Directory to save model checkpoints
-        
+        precision: Numeric precision for forward passes ("fp32", "fp16" or "bf16")
+        accum_steps: Number of micro-batches to accumulate before stepping
+
     Returns:
         Tuple of (train_losses, test_metrics)
     """
@@ -166,12 +249,28 @@ def train(
     test_losses = []
     test_metrics = []
     best_test_loss = 999
-    
+
+    # Checkpoints are written from a background thread so the disk write
+    # overlaps with the next epoch instead of blocking it
+    save_executor = ThreadPoolExecutor(max_workers=1)
+    save_future: Optional[Future] = None
+
     for epoch in range(num_epochs):
-        
-        log_print(body=f"Epoch {epoch + 1}/{num_epochs}", colour="cyan")
-        
-        train_loss = train_epoch(model, train_loader, optimizer, device)
+
+        if is_main_process():
+            log_print(body=f"Epoch {epoch + 1}/{num_epochs}", colour="cyan")
+
+        if isinstance(train_loader.sampler, DistributedSampler):
+            train_loader.sampler.set_epoch(epoch)
+
+        train_loss = train_epoch(
+            model,
+            train_loader,
+            optimizer,
+            device,
+            precision=precision,
+            accum_steps=accum_steps,
+        )
         train_losses.append(train_loss)
         
         is_final_epoch = epoch == num_epochs - 1
@@ -182,72 +281,145 @@ def train(
             device,
             train_loss=train_loss,
             final_epoch=is_final_epoch,
-            output_dir=output_dir if is_final_epoch else None
+            output_dir=output_dir if is_final_epoch else None,
+            precision=precision,
         )
         test_losses.append(test_loss)
         test_metrics.append(metrics)
         
         if test_loss < best_test_loss:
             best_test_loss = test_loss
-            save_dict = {
-                "epoch": epoch,
-                "model_state_dict": model.state_dict(),
-                "optimizer_state_dict": optimizer.state_dict(),
-                "test_loss": test_loss,
-                "test_metrics": metrics,
-            }
-                
-            torch.save(save_dict, output_dir / "best_model.pt")
-            log_print(
-                body=f"Saved best model with test loss: {best_test_loss:.4f}", 
-                colour="green",
-            )
-        
+            if is_main_process():
+                # Don't let two checkpoint writes interleave
+                if save_future is not None:
+                    save_future.result()
+
+                # Unwrap torch.compile/DDP so checkpoint keys match a bare
+                # model and predict.py can load them strictly
+                base_model = getattr(model, "_orig_mod", model)
+                if isinstance(base_model, DDP):
+                    base_model = base_model.module
+
+                save_dict = {
+                    "epoch": epoch,
+                    "model_state_dict": snapshot_to_cpu(base_model.state_dict()),
+                    "optimizer_state_dict": snapshot_to_cpu(optimizer.state_dict()),
+                    "test_loss": test_loss,
+                    "test_metrics": metrics,
+                }
+
+                save_future = save_executor.submit(
+                    torch.save, save_dict, output_dir / "best_model.pt"
+                )
+                log_print(
+                    body=f"Saving best model with test loss: {best_test_loss:.4f}",
+                    colour="green",
+                )
+
         if test_loss > best_test_loss + early_stop_threshold:
-            log_print(body=f"Early stop")
+            if is_main_process():
+                log_print(body=f"Early stop")
             break
-    
+
+    # Make sure the last checkpoint write has finished and surface any failure
+    if save_future is not None:
+        save_future.result()
+    save_executor.shutdown(wait=True)
+
     return train_losses, test_metrics
 
 
 def main(args: Hyperparameters):
     """Main training function."""
     
-    log_panel(
-        colour="green", 
-        body= "Starting Model Training", 
-        title="Training"
-    )
-        
-    device = get_device()
-    
+    if is_main_process():
+        log_panel(
+            colour="green",
+            body= "Starting Model Training",
+            title="Training"
+        )
+
+    # torchrun sets RANK/WORLD_SIZE; otherwise fall back to single-process
+    device = init_distributed()
+    distributed = device is not None
+    if device is None:
+        device = get_device()
+
+    if device.type == "cuda":
+        # Allow TF32 so FP32 matmuls use Tensor Cores on Ampere+ GPUs
+        torch.set_float32_matmul_precision("high")
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+
     df = load_dataset(args.data_path)
     train_df, test_df = split_dataset(df, test_size=args.test_size)
     
-    log_print(body=f"Train size: {len(train_df)}, Test size: {len(test_df)}")
-    log_print(body=f"Train label distribution: {train_df['label'].value_counts().to_dict()}")
-    log_print(body=f"Test label distribution: {test_df['label'].value_counts().to_dict()}")
-    
+    if is_main_process():
+        log_print(body=f"Train size: {len(train_df)}, Test size: {len(test_df)}")
+        log_print(body=f"Train label distribution: {train_df['label'].value_counts().to_dict()}")
+        log_print(body=f"Test label distribution: {test_df['label'].value_counts().to_dict()}")
+
     train_loader, test_loader = create_dataloaders(
-        train_df, 
-        test_df, 
-        tokenizer_name=args.model_name, 
-        batch_size=args.batch_size
+        train_df,
+        test_df,
+        tokenizer_name=args.model_name,
+        batch_size=args.batch_size,
+        num_workers=args.num_workers,
+        prefetch_factor=args.prefetch_factor,
+        static_shapes=args.static_shapes,
+        distributed=distributed,
+        group_by_length=args.group_by_length,
     )
     
     model = DistilBERTClassifier(model_name=args.model_name)
     model.to(device)
-    
-    optimizer = optim.AdamW(model.parameters(), lr=args.learning_rate)
+
+    if args.freeze_layers > 0:
+        model.freeze_layers(args.freeze_layers)
+
+    if distributed:
+        # Gradient AllReduce overlaps with backward via 25MB buckets
+        model = DDP(model, device_ids=[device.index], bucket_cap_mb=25)
+
+    if args.compile_model:
+        # Inductor fuses the pointwise ops (LayerNorm, GELU, softmax epilogues)
+        # and cuts kernel-launch overhead; the first step pays the compile cost
+        model = torch.compile(model, mode="reduce-overhead", fullgraph=False)
+
+
+    # The fused CUDA kernel updates all parameters in one launch instead of
+    # one per tensor; only available on CUDA
+    # Only trainable parameters get optimizer state
+    optimizer = optim.AdamW(
+        (p for p in model.parameters() if p.requires_grad),
+        lr=args.learning_rate,
+        fused=device.type == "cuda",
+    )
     
     output_dir = Path(args.output_dir)
     train(
-        model, 
-        train_loader, 
-        test_loader, 
-        optimizer, 
-        device, 
-        num_epochs=args.num_epochs, 
+        model,
+        train_loader,
+        test_loader,
+        optimizer,
+        device,
+        num_epochs=args.num_epochs,
         early_stop_threshold=args.early_stop_threshold,
         output_dir=output_dir,
-    )
\ No newline at end of file
+        precision=args.precision,
+        accum_steps=args.accum_steps,
+    )
+
+    if args.quantize:
+        if is_main_process():
+            log_print(body="Evaluating int8-quantized model", colour="cyan")
+
+        # Dynamic int8 quantization of the linear layers runs on CPU and
+        # halves weight bytes vs fp16; training is untouched. torch.compile
+        # wraps the DDP wrapper, so strip _orig_mod before .module
+        base_model = getattr(model, "_orig_mod", model)
+        base_model = base_model.module if isinstance(base_model, DDP) else base_model
+        quantized_model = torch.ao.quantization.quantize_dynamic(
+            base_model.cpu(), {nn.Linear}, dtype=torch.qint8
+        )
+        evaluate(quantized_model, test_loader, torch.device("cpu"))
\ No newline at end of file
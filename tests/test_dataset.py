@@ -6,12 +6,15 @@ import json
 import pandas as pd
 import pytest
 import torch
+from transformers import DistilBertTokenizer
 
 from src.data_preprocessing.dataset import (
-    load_dataset, 
-    split_dataset, 
-    LoanDefaultDataset, 
-    create_dataloaders
+    load_dataset,
+    split_dataset,
+    LoanDefaultDataset,
+    create_dataloaders,
+    LengthBucketBatchSampler,
+    PaddingCollator
 )
 
 
@@ -106,4 +109,81 @@ def test_create_dataloaders(sample_data):
     # Check batch size
     for batch in train_loader:
         assert batch["input_ids"].shape[0] <= 2  # Batch size might be smaller for the last batch
-        break
\ No newline at end of file
+        break
+
+@pytest.fixture
+def small_tokenizer(tmp_path):
+    """Create a tokenizer from a tiny local vocab (no model download)."""
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text(
+        "\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "sample", "text"])
+    )
+    return DistilBertTokenizer(str(vocab_file))
+
+
+def test_padding_collator(small_tokenizer):
+    """Test that PaddingCollator pads batches to a multiple of 8."""
+    batch = [
+        {
+            "input_ids": torch.tensor([2, 5, 6, 3]),
+            "attention_mask": torch.ones(4, dtype=torch.long),
+            "label": torch.tensor(0),
+        },
+        {
+            "input_ids": torch.tensor([2, 5, 6, 5, 6, 3]),
+            "attention_mask": torch.ones(6, dtype=torch.long),
+            "label": torch.tensor(1),
+        },
+    ]
+
+    collated = PaddingCollator(small_tokenizer)(batch)
+
+    # Longest sequence is 6, rounded up to a multiple of 8
+    assert collated["input_ids"].shape == (2, 8)
+    assert collated["attention_mask"].shape == (2, 8)
+    assert collated["label"].tolist() == [0, 1]
+
+    # Attention masks cover only the real tokens; padding uses the pad token
+    assert collated["attention_mask"].sum(dim=1).tolist() == [4, 6]
+    pad_token_id = small_tokenizer.pad_token_id
+    assert collated["input_ids"][0, 4:].eq(pad_token_id).all()
+
+
+def test_padding_collator_fixed_length(small_tokenizer):
+    """Test that a max_length collator pads every batch to that length."""
+    batch = [
+        {
+            "input_ids": torch.tensor([2, 5, 3]),
+            "attention_mask": torch.ones(3, dtype=torch.long),
+            "label": torch.tensor(1),
+        },
+    ]
+
+    collated = PaddingCollator(small_tokenizer, max_length=16)(batch)
+
+    assert collated["input_ids"].shape == (1, 16)
+    assert collated["attention_mask"].shape == (1, 16)
+
+
+def test_length_bucket_batch_sampler():
+    """Test batch coverage and length consistency of the bucketed sampler."""
+    lengths = [(i * 37) % 100 for i in range(23)]
+
+    sampler = LengthBucketBatchSampler(lengths, batch_size=4, bucket_size=2)
+    batches = list(sampler)
+
+    # __len__ matches the yielded batches and every index appears exactly once
+    assert len(batches) == len(sampler) == 6
+    covered = sorted(index for batch in batches for index in batch)
+    assert covered == list(range(23))
+
+
+def test_length_bucket_batch_sampler_drop_last():
+    """Test that drop_last removes the final partial batch."""
+    lengths = list(range(10))
+
+    sampler = LengthBucketBatchSampler(lengths, batch_size=4, drop_last=True)
+    batches = list(sampler)
+
+    assert len(batches) == len(sampler) == 2
+    assert all(len(batch) == 4 for batch in batches)
@@ -35,11 +35,11 @@ def test_model_forward_pass():
         attention_mask = torch.ones((batch_size, seq_length))
         
         # Test forward pass without labels
-        outputs = model(input_ids, attention_mask)
-        
-        # Check if logits are returned
-        assert "logits" in outputs
-        assert outputs["logits"].shape == (batch_size, 2)  # 2 is the default num_labels
+        loss, logits = model(input_ids, attention_mask)
+
+        # Check if logits are returned (loss is None without labels)
+        assert loss is None
+        assert logits.shape == (batch_size, 2)  # 2 is the default num_labels
         
         # Test forward pass with labels
         labels = torch.tensor([0, 1])